@@ -1,8 +1,15 @@
 import argparse
 import csv
+import math
 import os
 import random
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Tuple
+
+try:
+    # pandas 可选：装了就走向量化路径，行多时快一个量级
+    import pandas as pd
+except ImportError:
+    pd = None
 
 
 DEFAULT_CSV = "./clash_node_report.csv"
@@ -25,17 +32,30 @@ def write_demo_csv(path: str, n: int = 30) -> None:
         w.writerows(rows)
 
 
-def read_csv(path: str) -> List[Dict[str, Any]]:
-    with open(path, "r", newline="", encoding="utf-8") as f:
-        r = csv.DictReader(f)
-        rows = []
-        for row in r:
-            # 允许列名略有变化时更鲁棒一点
-            rows.append(row)
-        return rows
+def read_csv(path: str) -> Tuple[List[str], List[List[str]]]:
+    # utf-8-sig：带 BOM 的报表第一列名不会变成 "﻿node"
+    with open(path, "r", newline="", encoding="utf-8-sig") as f:
+        r = csv.reader(f)
+        # csv.reader 不用每行建一个 dict，比 DictReader 快不少；
+        # 列名只在这里规范化一次，后面按下标取值不再逐行 strip
+        fieldnames = [h.strip() for h in next(r, [])]
+        return fieldnames, list(r)
+
+
+def find_col(fieldnames: List[str], *names: str) -> int:
+    # 允许列名略有变化时更鲁棒一点；找不到返回 -1
+    for name in names:
+        if name in fieldnames:
+            return fieldnames.index(name)
+    return -1
 
 
 def to_float(x: Any, default: float = 0.0) -> float:
+    # 已经是数值就直接返回，省一次构造
+    if type(x) is float:
+        return x
+    if type(x) is int:
+        return float(x)
     try:
         return float(x)
     except Exception:
@@ -43,25 +63,138 @@ def to_float(x: Any, default: float = 0.0) -> float:
 
 
 def to_int(x: Any, default: int = 0) -> int:
+    if type(x) is int:
+        return x
+    # CSV 里绝大多数是 "12" 这种整数串，先走 int() 快路径，
+    # 只有 "12.0" 之类才退回 float 再取整
+    try:
+        return int(x)
+    except Exception:
+        pass
     try:
         return int(float(x))
     except Exception:
         return default
 
 
-def rank_nodes(rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+def _rank_nodes_pandas(fieldnames: List[str], rows: List[List[str]]) -> List[Dict[str, Any]]:
+    # 向量化版本：整列做数值转换和打分，不再逐行调 to_float/to_int
+    # 行长先和表头对齐（短行补空串、长行截断），不然 DataFrame 直接报错；
+    # 对齐后的行为和 DictReader 的 restval/restkey 一致
+    width = len(fieldnames)
+    rows = [row if len(row) == width else (row + [""] * (width - len(row)))[:width]
+            for row in rows]
+    df = pd.DataFrame(rows, columns=fieldnames)
+
+    def _num(names, default=0.0):
+        # default 传 None 表示缺失值保留为 NaN，交给排序处理
+        for cand in names:
+            if cand in df.columns:
+                s = pd.to_numeric(df[cand], errors="coerce")
+                return s if default is None else s.fillna(default)
+        return pd.Series(math.nan if default is None else default, index=df.index)
+
+    for cand in ("node", "name", "server"):
+        if cand in df.columns:
+            # 整列一次 strip（C 循环），空值统一落到 unknown
+            node = df[cand].fillna("").astype(str).str.strip()
+            node = node.mask(node == "", "unknown")
+            break
+    else:
+        node = pd.Series("unknown", index=df.index)
+
+    risk = _num(("risk_score",))
+
+    if "error_count" in df.columns:
+        err = _num(("error_count",)).astype(int)
+    else:
+        # 宽表变体：err_* 每列一种错误，非空单元格数即错误数
+        err_cols = [c for c in df.columns if c.startswith("err_")]
+        if err_cols:
+            # 和纯 Python 路径一样先 strip，纯空白的单元格不算错误
+            err = df[err_cols].fillna("").apply(lambda c: c.str.strip() != "").sum(axis=1)
+        else:
+            err = pd.Series(0, index=df.index)
+
+    if any(c in df.columns for c in ("avg_latency_s", "avg_latency", "latency")):
+        lat = _num(("avg_latency_s", "avg_latency", "latency"), None)
+    else:
+        # 没有汇总延迟列就对每次测量 t_*_s 取平均（skipna）
+        t_cols = [c for c in df.columns if c.startswith("t_") and c.endswith("_s")]
+        if t_cols:
+            lat = df[t_cols].apply(pd.to_numeric, errors="coerce").mean(axis=1).round(4)
+        else:
+            lat = pd.Series(math.nan, index=df.index)
+
+    out = pd.DataFrame({
+        "node": node,
+        "risk_score": risk,
+        "error_count": err,
+        "avg_latency_s": lat,
+        "final_score": (risk * 100 + err * 2 + lat * 10).round(4),
+    })
+    # mergesort 是稳定排序，和 list.sort 的结果保持一致；NaN 分数排最后
+    out = out.sort_values("final_score", kind="mergesort", na_position="last")
+    return out.to_dict("records")
+
+
+def _score_key(row: Dict[str, Any]) -> float:
+    # 缺延迟数据的行分数是 NaN，排序时折算成 inf 排到最后；
+    # inf 只存在于排序这一刻，不会写进结果
+    score = row["final_score"]
+    return math.inf if math.isnan(score) else score
+
+
+def rank_nodes(fieldnames: List[str], rows: List[List[str]]) -> List[Dict[str, Any]]:
     # 期望列名：node, risk_score, error_count, avg_latency_s
+    if pd is not None:
+        return _rank_nodes_pandas(fieldnames, rows)
+
+    # 列名只解析一次，循环里直接按下标取值，不再逐行 hash 查 dict
+    node_idx = find_col(fieldnames, "node", "name", "server")
+    risk_idx = find_col(fieldnames, "risk_score")
+    err_idx = find_col(fieldnames, "error_count")
+    lat_idx = find_col(fieldnames, "avg_latency_s", "avg_latency", "latency")
+
+    # 宽表变体没有汇总列，只有逐次测量的 t_*_s 和逐类错误的 err_* 列；
+    # 列名匹配只在头部做一次，循环里用现成的下标列表直接取值
+    t_idx = [i for i, h in enumerate(fieldnames)
+             if h.startswith("t_") and h.endswith("_s")] if lat_idx < 0 else []
+    errcol_idx = [i for i, h in enumerate(fieldnames)
+                  if h.startswith("err_")] if err_idx < 0 else []
+
     ranked = []
+    # 热循环里把全局函数和方法查找提到局部变量，省掉逐行的重复查找
+    _float = to_float
+    _int = to_int
+    _append = ranked.append
+    _nan = math.nan
     for row in rows:
-        node = row.get("node") or row.get("name") or row.get("server") or "unknown"
-        risk = to_float(row.get("risk_score"))
-        err = to_int(row.get("error_count"))
-        lat = to_float(row.get("avg_latency_s") or row.get("avg_latency") or row.get("latency"))
+        n = len(row)
+        node = (row[node_idx].strip() if 0 <= node_idx < n else "") or "unknown"
+        risk = _float(row[risk_idx] if 0 <= risk_idx < n else None)
+        if err_idx >= 0:
+            err = _int(row[err_idx] if err_idx < n else None)
+        else:
+            err = sum(1 for i in errcol_idx if i < n and row[i].strip())
+        # 延迟缺失用 NaN 表示，避免 0.0 让坏行反而排到前面
+        if lat_idx >= 0:
+            lat = _float(row[lat_idx] if lat_idx < n else None, _nan)
+        else:
+            # 等价 nanmean：对 t_*_s 取平均，跳过解析不了的值
+            total, count = 0.0, 0
+            for i in t_idx:
+                if i < n:
+                    v = _float(row[i], _nan)
+                    if v == v:  # 不是 NaN
+                        total += v
+                        count += 1
+            lat = round(total / count, 4) if count else _nan
 
         # 简单综合评分：越低越好
         score = risk * 100 + err * 2 + lat * 10
 
-        ranked.append({
+        _append({
             "node": node,
             "risk_score": risk,
             "error_count": err,
@@ -69,7 +202,7 @@ def rank_nodes(rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
             "final_score": round(score, 4),
         })
 
-    ranked.sort(key=lambda x: x["final_score"])
+    ranked.sort(key=_score_key)
     return ranked
 
 
@@ -105,8 +238,8 @@ def main():
     if not os.path.exists(args.csv_path):
         raise SystemExit(f"CSV not found: {args.csv_path}\nTip: run with --demo or provide --csv <path>")
 
-    rows = read_csv(args.csv_path)
-    ranked = rank_nodes(rows)
+    fieldnames, rows = read_csv(args.csv_path)
+    ranked = rank_nodes(fieldnames, rows)
     top = ranked[: max(0, args.top_n)]
 
     print(f"Top {len(top)} nodes (lower score is better):")